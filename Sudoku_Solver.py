@@ -4,242 +4,258 @@
     Authors: Dimitrios Chavouzis, Will Baldwin
 """
 
-from random import randrange
+from random import Random
 import time
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
+import os
+from queue import Empty
 from collections import Counter
-import sys
 
-# Increase recursion limit for deep backtracking puzzles
-sys.setrecursionlimit(2000)
+try:
+    import numpy as np
+    from numba import njit
+except ImportError:
+    # Numba is optional: without it the C core or the pure Python search is used
+    njit = None
 
-"""
-Cell object that represents each square in a Sudoku puzzle
-"""
+try:
+    import cffi
+except ImportError:
+    cffi = None
 
-class Cell:
+# Bit k of a candidate mask means digit k+1 is still possible
+FULL_MASK = 0x1FF
 
-    def __init__(self, id):
-        self.id = id
-        self.cur_val = 0 # 0 for unassigned
-        self.values = list(range(1, 10)) # Domain (possible values)
-        self.neighbors = []
-        self.assigned_neigh = 0 # Counter for degree heuristic
+# Maps the puzzle characters to cell values: "1"-"9" to 1-9, "." and "0" to 0
+CLUE_TABLE = bytes.maketrans(b".0123456789", bytes([0]) + bytes(range(10)))
+CLUE_CHARS = frozenset(".0123456789")
 
-    def add_value(self, number):
-        self.values.append(number)
+# Seconds a puzzle is searched deterministically before racing randomized restarts
+WARMUP_BUDGET = 0.1
 
-    def get_values(self):
-        return self.values
+# Lookup tables over all 9-bit masks: number of set bits, and the digit
+# index (0-8) of the lowest set bit
+POPCNT = bytes(bin(i).count("1") for i in range(512))
+LOW_DIGIT = bytes((i & -i).bit_length() - 1 if i else 0 for i in range(512))
 
-    def set_current(self, number):
-        self.cur_val = number
-        
-"""
-=============================================================================
-"""
+# Row, column and 3x3 box of each of the 81 cells (row-major index)
+ROW = [i // 9 for i in range(81)]
+COL = [i % 9 for i in range(81)]
+BOX = [(i // 9 // 3) * 3 + (i % 9) // 3 for i in range(81)]
+
+# The 20 neighbors (peers) of each cell: every other cell sharing its row, column or box
+UNITS = [{j for j in range(81) if ROW[j] == ROW[i] or COL[j] == COL[i] or BOX[j] == BOX[i]}
+         for i in range(81)]
+PEERS = [tuple(sorted(UNITS[i] - {i})) for i in range(81)]
 
 """
-Board object that represents a Sudoku puzzle. It includes cells and various functions.
+Board object that represents a Sudoku puzzle. The state is kept as the current
+value of each cell plus one bitmask per row, column and box of the digits used.
 """
 
 class Board:
 
-    def __init__(self):
-        # Initializing the 9x9 board with unique IDs for cell tracking (Box, Row, Col)
-        rows = []
-        
-        row_1 = [Cell("A11"), Cell("A12") , Cell("A13") , Cell("B14"), Cell("B15"), Cell("B16"), Cell("C17"), Cell("C18"), Cell("C19")]
-        rows.append(row_1)
-        
-        row_2 = [Cell("A21"), Cell("A22") , Cell("A23") , Cell("B24"), Cell("B25"), Cell("B26"), Cell("C27"), Cell("C28"), Cell("C29")]
-        rows.append(row_2)
-
-        row_3 = [Cell("A31"), Cell("A32") , Cell("A33") , Cell("B34"), Cell("B35"), Cell("B36"), Cell("C37"), Cell("C38"), Cell("C39")]
-        rows.append(row_3)
-        
-        row_4 = [Cell("D41"), Cell("D42") , Cell("D43") , Cell("E44"), Cell("E45"), Cell("E46"), Cell("F47"), Cell("F48"), Cell("F49")]
-        rows.append(row_4)
+    __slots__ = ("cells", "rm", "cm", "bm", "domains", "empty", "empties")
 
-        row_5 = [Cell("D51"), Cell("D52") , Cell("D53") , Cell("E54"), Cell("E55"), Cell("E56"), Cell("F57"), Cell("F58"), Cell("F59")]
-        rows.append(row_5)
-        
-        row_6 = [Cell("D61"), Cell("D62") , Cell("D63") , Cell("E64"), Cell("E65"), Cell("E66"), Cell("F67"), Cell("F68"), Cell("F69")]
-        rows.append(row_6)
-
-        row_7 = [Cell("G71"), Cell("G72") , Cell("G73") , Cell("H74"), Cell("H75"), Cell("H76"), Cell("I77"), Cell("I78"), Cell("I79")]
-        rows.append(row_7)
-        
-        row_8 = [Cell("G81"), Cell("G82") , Cell("G83") , Cell("H84"), Cell("H85"), Cell("H86"), Cell("I87"), Cell("I88"), Cell("I89")]
-        rows.append(row_8)
-
-        row_9 = [Cell("G91"), Cell("G92") , Cell("G93") , Cell("H94"), Cell("H95"), Cell("H96"), Cell("I97"), Cell("I98"), Cell("I99")]
-        rows.append(row_9)
-       
-        self.board = [[y for y in row] for row in rows]
+    def __init__(self):
+        self.cells = bytearray(81) # 0 for unassigned
+        self.rm = [0] * 9 # Digits used in each row
+        self.cm = [0] * 9 # Digits used in each column
+        self.bm = [0] * 9 # Digits used in each box
+        self.domains = [FULL_MASK] * 81 # Domains pruned by AC-3
+        self.empty = set(range(81)) # Indices of the unassigned cells
+        self.empties = 81 # Number of unassigned cells
 
     def __len__(self):
         return 9
 
     def __getitem__(self, tup):
-        y, x = tup
-        y = int(y)
-        x = int(x)
-        return self.board[y][x]
+        return self.cells[tup[0] * 9 + tup[1]]
+
+    """
+    Empties the board in place so the same object can be reused for another puzzle
+    """
+    def reset(self):
+        self.cells[:] = bytes(81)
+        self.rm[:] = self.cm[:] = self.bm[:] = [0] * 9
+        self.domains[:] = [FULL_MASK] * 81
+        self.empty.update(range(81))
+        self.empties = 81
     
     """
-    Fills the board with the initial given clues
+    Fills the board with the initial given clues (any previous puzzle is cleared first).
+    Raises ValueError unless the puzzle is exactly 81 characters of "." and 0-9.
     """
     def fill_initial_board(self, str_board):
-        count = 0
-        for c in str_board:
-            row = count // 9
-            col = count % 9
-            if(c != "."):
+        if len(str_board) != 81 or not CLUE_CHARS.issuperset(str_board):
+            raise ValueError(f"Puzzle must be 81 characters of '.' and 0-9: {str_board!r}")
+        self.reset()
+        # Convert all 81 characters to cell values in one pass
+        self.cells[:] = str_board.encode().translate(CLUE_TABLE)
+        for count, d in enumerate(self.cells):
+            if d:
                 # Initial assignment (a clue)
-                self[row,col].set_current(int(c)) 
-            count = count + 1
+                bit = 1 << (d - 1)
+                self.domains[count] = bit
+                self.empty.discard(count)
+                self.empties -= 1
+                self.rm[ROW[count]] |= bit
+                self.cm[COL[count]] |= bit
+                self.bm[BOX[count]] |= bit
         return self
 
     """
-    Assigns neighbors to each cell in our Board object (Row, Column, and 3x3 Box constraints)
+    Forward Check: the domain of a cell is every digit of its AC-3 domain not yet
+    used in its row, column or box
     """
-    def find_neighbors(self , box , row , col):
-        neighbors = []
-        assigned = 0
-        
-        for i in range(len(self)):
-            for j in range(len(self)):
-                cell = self.board[i][j]
-                
-                # Exclude the cell itself
-                if cell.id[1] == row and cell.id[2] == col:
-                    continue 
-
-                # Check if it's in the same box, row, or column
-                if (cell.id[0] == box or cell.id[1] == row or cell.id[2] == col):
-                    if (cell.cur_val != 0):
-                        assigned += 1
-                    neighbors.append(cell)
-        
-        r = int(row) - 1
-        c = int(col) - 1
-  
-        self[r,c].neighbors = neighbors
-        self[r,c].assigned_neigh = assigned # Used by the Degree Heuristic
+    def candidates(self, i):
+        return self.domains[i] & ~(self.rm[ROW[i]] | self.cm[COL[i]] | self.bm[BOX[i]])
 
-        return neighbors
+    """
+    Assigns the digit of the single-bit mask bit to cell i and marks it as used
+    in the cell's row, column and box
+    """
+    def assign(self, i, bit):
+        self.cells[i] = LOW_DIGIT[bit] + 1
+        self.empty.discard(i)
+        self.empties -= 1
+        self.rm[ROW[i]] ^= bit
+        self.cm[COL[i]] ^= bit
+        self.bm[BOX[i]] ^= bit
 
     """
-    Forward Check: Updates a cell's domain based on its currently assigned neighbors.
-    This is used for initial domain setup and simple forward checking in backtracking.
+    Un-assigns cell i, releasing its digit in the cell's row, column and box
     """
-    def initial_values(self, neighbors, cell):
-        all_poss = set(range(1, 10))
-        
-        # Remove values used by assigned neighbors
-        for neighbor in neighbors:
-            val = neighbor.cur_val
-            if val != 0 and val in all_poss:
-                all_poss.remove(val)
-            
-        # The cell's domain is updated
-        cell.values = list(all_poss)
-        return cell.values
+    def unassign(self, i):
+        bit = 1 << (self.cells[i] - 1)
+        self.cells[i] = 0
+        self.empty.add(i)
+        self.empties += 1
+        self.rm[ROW[i]] ^= bit
+        self.cm[COL[i]] ^= bit
+        self.bm[BOX[i]] ^= bit
     
     """
     Check if board is solved
     """
     def board_is_solved(self):
-        for i in range(len(self)):
-            for j in range(len(self)):
-                if (self[i,j].cur_val == 0 ):
-                    return False
-        return True
+        return self.empties == 0
     
     """
-    Backtracking to solve a given sudoku puzzle. Implements MRV, Degree, and LCV.
-    The pcell argument is kept for compatibility with the original signature but is unused.
+    Backtracking to solve a given sudoku puzzle. Implements MRV.
+    The search is iterative: each stack frame holds a cell index, the mask of
+    values still to try for it (taken lowest digit first) and the cells forced
+    by naked-single propagation from its current value.
+    With rng, MRV ties and the value order are randomized instead. The search gives
+    up and returns None (leaving the board partially assigned) once the deadline
+    passes or the stop event is set; passing its stack back in, with the board in
+    that same state, resumes it.
     """
-    def backtrack_with_min_val(self, pcell=None):
-        # Base Case: All cells are assigned
-        if (self.board_is_solved()):
-            return True
-
-        # Variable Ordering: Find the cell with the fewest possible values (MRV + Degree)
-        min_cell = self.find_less_poss()
-
-        # Update the domain of the selected cell based on fixed constraints (Forward Check)
-        self.initial_values(min_cell.neighbors, min_cell) 
+    def backtrack_with_min_val(self, deadline=None, rng=None, stop=None, stack=None):
+        if stack is None:
+            stack = []
+        nodes = 0
         
-        # If the domain is empty, backtrack immediately
-        if not min_cell.values:
-            return False
+        while True:
+            # Base Case: All cells are assigned
+            if (self.board_is_solved()):
+                return True
+
+            # Only look at the clock and the stop event every 1024 nodes
+            nodes += 1
+            if not nodes & 1023:
+                if deadline is not None and time.time() > deadline:
+                    return None
+                if stop is not None and stop.is_set():
+                    return None
+
+            # Variable Ordering: Find the cell with the fewest possible values (MRV)
+            min_idx, cand = self.find_less_poss(rng)
+            
+            # An empty domain falls straight through to backtracking
+            if cand:
+                stack.append((min_idx, cand, ()))
 
-        # Value Ordering: Least Constraining Value (LCV) heuristic
-        ordered_values = min_cell.values
-        if len(min_cell.values) > 1:
-            # LCV returns an ordered list of values to try
-            ordered_values = least_constr_val(min_cell)
-
-        # Loop through ordered values
-        for i in ordered_values:
-            # Check for conflict with ALREADY assigned neighbors (is_allowed check is now redundant 
-            # if initial_values worked, but kept for robustness/legacy)
-            if is_allowed(min_cell, i): 
+            # Take the next value of the top frame, dropping exhausted frames
+            while stack:
+                idx, pending, forced = stack.pop()
                 
-                # 1. Assignment
-                min_cell.set_current(int(i))
+                # Backtrack: Un-assign the value tried last in this frame and all it forced
+                for j in forced:
+                    self.unassign(j)
+                if self.cells[idx]:
+                    self.unassign(idx)
                 
-                # 2. Recursive Call
-                sol = self.backtrack_with_min_val(min_cell)
-
-                if (sol):
-                    return sol
-                
-        # 3. Backtrack: Un-assign the value
-        min_cell.set_current(0)
-        return False
+                if pending:
+                    # Assignment of the lowest (or a random) remaining value
+                    if rng is None:
+                        bit = pending & -pending
+                    else:
+                        bit = random_bit(pending, rng)
+                    self.assign(idx, bit)
+                    forced = []
+                    consistent = self.propagate(idx, forced)
+                    stack.append((idx, pending ^ bit, forced))
+                    # On a contradiction the same frame is popped again for its next value
+                    if consistent:
+                        break
+            else:
+                return False
     
     """
-    Degree heuristic - breaks ties in MRV by picking cell with the FEWEST *assigned* neighbors.
-    (Note: The standard degree heuristic prioritizes the most *unassigned* neighbors to maximize future pruning.)
+    Naked singles: after cell i is assigned, every unassigned peer left with a single
+    value is assigned too, repeated until nothing more is forced. The forced cells
+    are appended to forced. Returns False if some peer is left with no value.
     """
-    def degree(self, min_cell, other_cell):
-        # Tie-breaker: choose the one with more assigned neighbors to 'force' constraint earlier.
-        # This is a non-standard but functional tie-breaker.
-        if (other_cell.assigned_neigh > min_cell.assigned_neigh):
-            return other_cell
-        return min_cell
+    def propagate(self, i, forced):
+        queue = [i]
+        while queue:
+            j = queue.pop()
+            for k in PEERS[j]:
+                if self.cells[k] == 0:
+                    cand = self.candidates(k)
+                    if not cand:
+                        return False
+                    if not cand & (cand - 1):
+                        self.assign(k, cand)
+                        forced.append(k)
+                        queue.append(k)
+        return True
     
     """
     MRV heuristic - finds the cell with the least available remaining values.
-    Includes the call for the Degree heuristic if a tie is detected.
+    Returns the cell index together with its candidate mask.
+    With rng, ties are broken uniformly at random instead of taking the first cell.
     """
-    def find_less_poss(self): 
+    def find_less_poss(self, rng=None): 
         min_len = 10
-        min_cell = None
+        min_idx = -1
+        min_cand = 0
+        ties = 0
         
-        for i in range(len(self)):
-            for j in range(len(self)):
-                cell = self[i,j]
-                
-                # Only consider unassigned cells
-                if cell.cur_val == 0:
-                    
-                    # Ensure the domain is up to date based on assigned neighbors before checking length
-                    self.initial_values(cell.neighbors, cell)
-                    current_len = len(cell.values)
-                    
-                    if min_cell is None or current_len < min_len:
-                        min_len = current_len
-                        min_cell = cell
-                    
-                    # Degree Heuristic Tie-breaker
-                    elif current_len == min_len:
-                        min_cell = self.degree(min_cell, cell)
-                        min_len = len(min_cell.values) # Re-fetch min_len in case degree changed the cell
+        # Only consider unassigned cells
+        for i in self.empty:
+            cand = self.candidates(i)
+            current_len = POPCNT[cand]
+            
+            if current_len < min_len:
+                min_len = current_len
+                min_idx = i
+                min_cand = cand
+                ties = 1
+                # A single (or no) value cannot be beaten: stop scanning
+                if current_len <= 1:
+                    break
+            
+            # Random tie-breaker: keep each tied cell with probability 1/ties
+            elif rng is not None and current_len == min_len:
+                ties += 1
+                if rng.randrange(ties) == 0:
+                    min_idx = i
+                    min_cand = cand
                         
-        return min_cell
+        return min_idx, min_cand
     
     
 """
@@ -247,50 +263,353 @@ GENERAL METHODS
 =================================================================================
 """
 
-def solve_back(board):
-    # Start backtracking from an arbitrary cell (the function finds the true starting MRV cell)
-    return board.backtrack_with_min_val(board[0,0])
+# Board reused by every puzzle solved in this process
+BOARD = Board()
 
-def is_allowed(cell , value):
-    """
-    Checks if assigning 'value' to 'cell' violates any constraints 
-    with ALREADY ASSIGNED neighbors.
-    """
-    for i in cell.neighbors:
-        if (i.cur_val == value):
-            return False
+"""
+Sets up and solves a single puzzle. Runs in a worker process, so it only takes
+and returns plain values: the 81-digit result string (0 for unsolved cells),
+the solving time in seconds, whether the puzzle was solved (None if the search
+ran out of its warm-up budget) and, in that case, the search stack to resume.
+"""
+def solve_one(puzzle):
+    # Initialize Board with the fixed clues (row/column/box masks)
+    board = BOARD.fill_initial_board(puzzle)
+    stack = []
+    
+    # Solve; restarts only pay off with more than one core to race them on
+    start_back = time.time()
+    if (os.cpu_count() or 1) > 1:
+        solved = solve_back(board, deadline=start_back + WARMUP_BUDGET, stack=stack)
+    else:
+        solved = solve_back(board)
+    end_back = time.time()
+    
+    solution = "".join(str(d) for d in board.cells)
+    return solution, end_back - start_back, solved, stack if solved is None else None
+
+"""
+Solves a filled board. Returns True/False, or None if the search gave up (see
+Board.backtrack_with_min_val). Plain searches use the Numba kernel, or else the C
+core when Numba is missing; both check the clues and propagate singles themselves.
+Only the Python search runs AC-3 first.
+"""
+def solve_back(board, deadline=None, rng=None, stop=None, stack=None):
+    if rng is None:
+        if njit is not None:
+            return solve_native(board)
+        if C_CORE is not None:
+            return solve_c(board)
+    
+    # Prune every domain once with arc consistency; a wiped-out domain means no solution
+    if not ac3(board.domains):
+        return False
+    # Start backtracking (the function finds the true starting MRV cell)
+    return board.backtrack_with_min_val(deadline, rng, stop, stack)
+
+"""
+Races K processes on a puzzle whose warm-up search gave up. The first keeps going
+with the warm-up search (partial is its 81-digit board, stack its search stack),
+the others run randomized searches. The first to finish sets the stop event, which
+makes the others give up. Returns the 81-digit result string and whether the puzzle
+was solved.
+"""
+def solve_restarts(puzzle, partial, stack, workers=None):
+    workers = workers or os.cpu_count() or 1
+    stop = multiprocessing.Event()
+    results = multiprocessing.Queue()
+    args = [(puzzle, None, stop, results, partial, stack)]
+    args += [(puzzle, seed, stop, results, None, None) for seed in range(1, workers)]
+    procs = [multiprocessing.Process(target=restart_worker, args=a) for a in args]
+    for p in procs:
+        p.start()
+    
+    # Any finished search is final: a failure is a complete search proving no solution
+    solution = solved = None
+    while solved is None:
+        alive = any(p.is_alive() for p in procs)
+        try:
+            solution, solved = results.get(timeout=0.1)
+        except Empty:
+            # Workers flush their result before exiting, so none is coming
+            if not alive:
+                break
+    
+    stop.set()
+    for p in procs:
+        p.join()
+    if solved is None:
+        raise RuntimeError(f"Every restart worker exited without a result: {puzzle}")
+    return solution, solved
+
+"""
+One search of solve_restarts: the resumed warm-up search when seed is None,
+otherwise a randomized search seeded so every worker explores differently
+"""
+def restart_worker(puzzle, seed, stop, results, partial=None, stack=None):
+    board = BOARD.fill_initial_board(puzzle)
+    if seed is None:
+        # Rebuild the state the warm-up search stopped in: pruned domains plus its assignments
+        ac3(board.domains)
+        for i, d in enumerate(partial):
+            if d != "0" and not board.cells[i]:
+                board.assign(i, 1 << (int(d) - 1))
+        solved = board.backtrack_with_min_val(stop=stop, stack=stack)
+    else:
+        solved = solve_back(board, rng=Random(seed), stop=stop)
+    if solved is not None:
+        results.put(("".join(str(d) for d in board.cells), solved))
+
+"""
+Formats an 81-digit result string as the boxed 9x9 grid that main() prints
+"""
+def format_grid(solution):
+    lines = []
+    for i in range(9):
+        if (i % 3 == 0):
+            lines.append("+-------------------------+")
+        row = solution[i * 9:i * 9 + 9]
+        lines.append("".join(" | " + " ".join(row[j:j + 3]) + " " for j in (0, 3, 6)) + " |")
+    lines.append("+-------------------------+")
+    return "\n".join(lines)
+
+"""
+Picks one of the set bits of mask uniformly at random
+"""
+def random_bit(mask, rng):
+    for _ in range(rng.randrange(POPCNT[mask])):
+        mask &= mask - 1
+    return mask & -mask
+
+"""
+AC-3 - Makes every arc (Xi, Xj) between two peers arc consistent.
+For the Sudoku "not equal" constraint an arc only removes a value when Xj is a
+singleton, so the work queue holds the singleton cells, each of which clears its
+value from the domains of its 20 peers. Domains are bitmasks, updated in place.
+Returns False if a domain becomes empty.
+"""
+def ac3(domains):
+    queue = [xj for xj in range(81) if not domains[xj] & (domains[xj] - 1)]
+    
+    while queue:
+        xj = queue.pop()
+        dj = domains[xj]
+        for xi in PEERS[xj]:
+            di = domains[xi]
+            if di & dj:
+                di &= ~dj
+                domains[xi] = di
+                if not di:
+                    return False
+                # Xi just became a singleton, so its peers must lose its value too
+                if not di & (di - 1):
+                    queue.append(xi)
     return True
 
 """
-Least Constraining Value Heuristic - Sorts the values available according to their 
-                                     the constraints they pose to other UNASSIGNED cells.
+NATIVE SOLVER (Numba)
+=================================================================================
 """
-def least_constr_val(cell):
-    # This heuristic chooses a value that rules out the fewest options
-    # for UNASSIGNED neighbors, minimizing future constraints.
-    value_scores = []
+
+"""
+Iterative MRV search with naked-single propagation over flat arrays, written in the
+subset of Python that Numba compiles. The row/column/box masks rm, cm and bm are
+filled from the clues in cells, so no AC-3 pass is needed beforehand. peers is the
+flattened PEERS table (20 entries per cell) and popcnt and low_digit are the POPCNT
+and LOW_DIGIT tables. The frame_* arrays are scratch space for the explicit stack
+(cell index, values left to try and start of its forced cells in trail), and trail
+holds the cells forced by propagation.
+Returns True with cells and masks holding the solution, False if there is none
+(including clashing clues).
+"""
+def _solve_kernel(cells, rm, cm, bm, row_idx, col_idx, box_idx, peers,
+                  popcnt, low_digit, frame_idx, frame_cand, frame_trail, trail):
+    depth = 0
+    trail_len = 0
+    empties = 0
+    for k in range(9):
+        rm[k] = 0
+        cm[k] = 0
+        bm[k] = 0
+    for i in range(81):
+        if cells[i] == 0:
+            empties += 1
+            continue
+        bit = 1 << (cells[i] - 1)
+        if (rm[row_idx[i]] | cm[col_idx[i]] | bm[box_idx[i]]) & bit:
+            return False
+        rm[row_idx[i]] |= bit
+        cm[col_idx[i]] |= bit
+        bm[box_idx[i]] |= bit
     
-    # 1. Score each possible value in the cell's domain
-    for value in cell.values:
-        constraints_imposed = 0
-        
-        # Check unassigned neighbors
-        for neighbor in cell.neighbors:
-            # We only count constraints imposed on UNASSIGNED neighbors
-            if neighbor.cur_val == 0:
-                # Count how many future choices (unassigned neighbors) this value constrains
-                if value in neighbor.values:
-                    constraints_imposed += 1
-        
-        # Store the value and its score (lower score is better)
-        value_scores.append((value, constraints_imposed))
+    while True:
+        # Base Case: All cells are assigned
+        if empties == 0:
+            return True
+
+        # Variable Ordering: Find the cell with the fewest possible values (MRV)
+        min_len = 10
+        min_idx = -1
+        min_cand = 0
+        for i in range(81):
+            if cells[i] == 0:
+                cand = FULL_MASK & ~(rm[row_idx[i]] | cm[col_idx[i]] | bm[box_idx[i]])
+                current_len = popcnt[cand]
+                if current_len < min_len:
+                    min_len = current_len
+                    min_idx = i
+                    min_cand = cand
+                    if current_len <= 1:
+                        break
+
+        # An empty domain falls straight through to backtracking
+        if min_cand:
+            frame_idx[depth] = min_idx
+            frame_cand[depth] = min_cand
+            frame_trail[depth] = trail_len
+            depth += 1
+
+        # Take the next value of the top frame, popping exhausted frames
+        while depth > 0:
+            i = frame_idx[depth - 1]
+            
+            # Backtrack: Un-assign the value tried last in this frame and all it forced
+            while trail_len > frame_trail[depth - 1]:
+                trail_len -= 1
+                j = trail[trail_len]
+                bit = 1 << (cells[j] - 1)
+                cells[j] = 0
+                empties += 1
+                rm[row_idx[j]] ^= bit
+                cm[col_idx[j]] ^= bit
+                bm[box_idx[j]] ^= bit
+            if cells[i] != 0:
+                bit = 1 << (cells[i] - 1)
+                cells[i] = 0
+                empties += 1
+                rm[row_idx[i]] ^= bit
+                cm[col_idx[i]] ^= bit
+                bm[box_idx[i]] ^= bit
+            
+            pending = frame_cand[depth - 1]
+            if pending:
+                # Assignment of the lowest remaining value
+                bit = pending & -pending
+                frame_cand[depth - 1] = pending ^ bit
+                cells[i] = low_digit[bit] + 1
+                empties -= 1
+                rm[row_idx[i]] ^= bit
+                cm[col_idx[i]] ^= bit
+                bm[box_idx[i]] ^= bit
+                
+                # Naked singles: assign every peer left with one value, then their peers
+                consistent = True
+                head = trail_len
+                j = i
+                while consistent:
+                    for k in range(j * 20, j * 20 + 20):
+                        p = peers[k]
+                        if cells[p] == 0:
+                            cand = FULL_MASK & ~(rm[row_idx[p]] | cm[col_idx[p]] | bm[box_idx[p]])
+                            if cand == 0:
+                                consistent = False
+                                break
+                            if popcnt[cand] == 1:
+                                cells[p] = low_digit[cand] + 1
+                                empties -= 1
+                                rm[row_idx[p]] ^= cand
+                                cm[col_idx[p]] ^= cand
+                                bm[box_idx[p]] ^= cand
+                                trail[trail_len] = p
+                                trail_len += 1
+                    if head == trail_len:
+                        break
+                    j = trail[head]
+                    head += 1
+                
+                # On a contradiction the same frame is revisited for its next value
+                if consistent:
+                    break
+                continue
+            depth -= 1
         
-    # 2. Sort the values: least constraining values (lowest score) come first
-    # This uses a tuple for sorting: (score, value)
-    value_scores.sort(key=lambda x: x[1])
+        if depth == 0:
+            return False
+
+if njit is not None:
+    # An explicit signature compiles the kernel (or loads it from the cache) at
+    # import, so no puzzle pays for compilation inside its timed search
+    _solve_kernel = njit("b1(u1[::1], i8[::1], i8[::1], i8[::1], i8[::1], i8[::1], i8[::1], "
+                         "i8[::1], u1[::1], u1[::1], i8[::1], i8[::1], i8[::1], i8[::1])",
+                         cache=True)(_solve_kernel)
+    NB_ROW = np.array(ROW, dtype=np.int64)
+    NB_COL = np.array(COL, dtype=np.int64)
+    NB_BOX = np.array(BOX, dtype=np.int64)
+    NB_PEERS = np.array(PEERS, dtype=np.int64).ravel()
+    NB_POPCNT = np.array(list(POPCNT), dtype=np.uint8)
+    NB_LOW_DIGIT = np.array(list(LOW_DIGIT), dtype=np.uint8)
+
+"""
+Runs the compiled kernel on a board. The kernel writes the values straight into
+board.cells (shared buffer); the masks are copied back only if it finds a solution.
+"""
+def solve_native(board):
+    cells = np.frombuffer(board.cells, dtype=np.uint8)
+    rm = np.zeros(9, np.int64)
+    cm = np.zeros(9, np.int64)
+    bm = np.zeros(9, np.int64)
+    
+    solved = _solve_kernel(cells, rm, cm, bm, NB_ROW, NB_COL, NB_BOX, NB_PEERS,
+                           NB_POPCNT, NB_LOW_DIGIT,
+                           np.zeros(81, np.int64), np.zeros(81, np.int64),
+                           np.zeros(81, np.int64), np.zeros(81, np.int64))
     
-    # 3. Return only the values in the correct order
-    return [val for val, score in value_scores]
+    # A failed search un-assigns everything it tried (a clue clash stops before the
+    # masks are complete), so only a solution changes the board's bookkeeping
+    if solved:
+        board.rm[:] = rm.tolist()
+        board.cm[:] = cm.tolist()
+        board.bm[:] = bm.tolist()
+        board.empty.clear()
+        board.empties = 0
+    return bool(solved)
+
+if njit is not None:
+    # The first call still has to set up the compiled code; pay for it here, on an
+    # empty board, instead of in the first timed search
+    solve_native(Board())
+
+"""
+C SOLVER (cffi)
+=================================================================================
+"""
+
+# sudoku_core.c is compiled by FFI.verify at import when Numba is missing (cffi
+# reuses the built module while the source is unchanged); without cffi, a compiler
+# or the source file, the pure Python search is used
+C_CORE = None
+if njit is None and cffi is not None:
+    C_FFI = cffi.FFI()
+    C_FFI.cdef("int solve(uint8_t cells[81]);")
+    try:
+        with open(os.path.join(os.path.dirname(os.path.abspath(__file__)), "sudoku_core.c")) as f:
+            C_CORE = C_FFI.verify(f.read(), extra_compile_args=["-O2"])
+    except (OSError, ImportError, cffi.VerificationError):
+        C_CORE = None
+
+"""
+Runs the C core on a board. It solves board.cells in place (shared buffer); a
+solved board has every digit in every row, column and box, so the masks are full.
+"""
+def solve_c(board):
+    solved = C_CORE.solve(C_FFI.from_buffer("uint8_t[]", board.cells))
+    
+    # A failed search un-assigns everything it tried, so only a solution changes these
+    if solved:
+        board.rm[:] = board.cm[:] = board.bm[:] = [FULL_MASK] * 9
+        board.empty.clear()
+        board.empties = 0
+    return bool(solved)
 
 
 def main():
@@ -343,25 +662,20 @@ def main():
     total_time = 0
     solved_count = 0
     
-    for puzzle in evil: 
-        
-        start_board = Board()
-        
-        # 1. Initialize Board and Constraint Graph
-        for i in range(len(start_board)):
-            for j in range(len(start_board)):
-                cell = start_board[i,j]
-                neigh = start_board.find_neighbors(cell.id[0] , cell.id[1], cell.id[2])
-                filled_board = start_board.fill_initial_board(puzzle)
-                # 2. Set initial domains based on fixed clues
-                filled_board.initial_values(neigh, cell)
-       
-        # Solve
-        start_back = time.time()
-        solved = solve_back(filled_board)
-        end_back = time.time()
+    # Puzzles are independent, so they are solved in parallel across processes
+    with ProcessPoolExecutor() as ex:
+        results = list(ex.map(solve_one, evil))
+    
+    # Puzzles that outlasted the warm-up are raced one at a time once the pool is done,
+    # so each race has every core to itself
+    for k, (solution, elapsed_time, solved, stack) in enumerate(results):
+        if solved is None:
+            start_race = time.time()
+            solution, solved = solve_restarts(evil[k], solution, stack)
+            results[k] = (solution, elapsed_time + time.time() - start_race, solved, None)
+    
+    for solution, elapsed_time, solved, _ in results: 
         
-        elapsed_time = (end_back - start_back)
         total_time += elapsed_time
         
         if solved:
@@ -372,22 +686,12 @@ def main():
         
         
         # PRINTS THE SOLUTION OF THE BOARD
-        print("\nSolution:")
-        for i in range(len(filled_board)):
-            if (i % 3 == 0):
-                print("+-------------------------+")
-            count_col = 0
-            for j in range(len(filled_board)):
-                if (j % 3 == 0):
-                    print(" | ", end = "", flush = True),
-                print(filled_board[i,j].cur_val, end = " ", flush = True),
-                count_col = count_col + 1
-            print(" |")
-        print("+-------------------------+")
+        print("\nSolution:\n" + format_grid(solution))
         
     print("\n==============================================")
     print(f"Total Puzzles Solved: {solved_count} / {len(evil)}")
     if len(evil) > 0:
         print(f"Backtracking Average Time is: {total_time / len(evil):.4f} seconds")
     
-main()
\ No newline at end of file
+if __name__ == "__main__":
+    main()
\ No newline at end of file
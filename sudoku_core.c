@@ -0,0 +1,183 @@
+/*
+    C version of the bitmask Sudoku search, loaded by Sudoku_Solver.py through
+    cffi when Numba is not available. It runs the same algorithm as
+    _solve_kernel: MRV cell choice, values tried lowest digit first and
+    naked-single propagation, with an explicit stack instead of recursion.
+*/
+
+#include <stdint.h>
+
+#define FULL_MASK 0x1FF
+
+#define ROW(i) ((i) / 9)
+#define COL(i) ((i) % 9)
+#define BOX(i) (((i) / 27) * 3 + ((i) % 9) / 3)
+
+/* The 20 neighbors (peers) of each cell, built on the first call */
+static int peers[81][20];
+static int peers_ready = 0;
+
+struct state {
+    uint8_t *cells;     /* 0 for unassigned */
+    uint16_t rm[9];     /* Digits used in each row */
+    uint16_t cm[9];     /* Digits used in each column */
+    uint16_t bm[9];     /* Digits used in each box */
+    int empties;        /* Number of unassigned cells */
+    int trail[81];      /* Cells forced by propagation, in assignment order */
+    int trail_len;
+};
+
+static void init_peers(void)
+{
+    for (int i = 0; i < 81; i++) {
+        int n = 0;
+        for (int j = 0; j < 81; j++) {
+            if (j != i && (ROW(j) == ROW(i) || COL(j) == COL(i) || BOX(j) == BOX(i)))
+                peers[i][n++] = j;
+        }
+    }
+    peers_ready = 1;
+}
+
+/* Forward Check: every digit not yet used in the cell's row, column or box */
+static inline uint16_t candidates(const struct state *s, int i)
+{
+    return FULL_MASK & ~(s->rm[ROW(i)] | s->cm[COL(i)] | s->bm[BOX(i)]);
+}
+
+static inline void assign(struct state *s, int i, uint16_t bit)
+{
+    s->cells[i] = (uint8_t)(__builtin_ctz(bit) + 1);
+    s->rm[ROW(i)] ^= bit;
+    s->cm[COL(i)] ^= bit;
+    s->bm[BOX(i)] ^= bit;
+    s->empties--;
+}
+
+static inline void unassign(struct state *s, int i)
+{
+    uint16_t bit = (uint16_t)(1u << (s->cells[i] - 1));
+    s->cells[i] = 0;
+    s->rm[ROW(i)] ^= bit;
+    s->cm[COL(i)] ^= bit;
+    s->bm[BOX(i)] ^= bit;
+    s->empties++;
+}
+
+/*
+    Naked singles: after cell i is assigned, every unassigned peer left with a
+    single value is assigned too (and pushed on the trail), repeated until
+    nothing more is forced. Returns 0 if some peer is left with no value.
+*/
+static int propagate(struct state *s, int i)
+{
+    int head = s->trail_len;
+    int j = i;
+
+    for (;;) {
+        for (int k = 0; k < 20; k++) {
+            int p = peers[j][k];
+            if (s->cells[p] == 0) {
+                uint16_t cand = candidates(s, p);
+                if (cand == 0)
+                    return 0;
+                if ((cand & (cand - 1)) == 0) {
+                    assign(s, p, cand);
+                    s->trail[s->trail_len++] = p;
+                }
+            }
+        }
+        if (head == s->trail_len)
+            return 1;
+        j = s->trail[head++];
+    }
+}
+
+/*
+    Solves the 81 cells (row-major, 0 for empty) in place.
+    Returns 1 if solved, 0 if the puzzle has no solution (cells are then unchanged).
+*/
+int solve(uint8_t cells[81])
+{
+    struct state s = { .cells = cells };
+    int frame_idx[81];          /* Cell of each stack frame */
+    uint16_t frame_cand[81];    /* Values still to try for it */
+    int frame_trail[81];        /* Start of its forced cells in the trail */
+    int depth = 0;
+
+    if (!peers_ready)
+        init_peers();
+
+    for (int i = 0; i < 81; i++) {
+        if (cells[i] == 0) {
+            s.empties++;
+            continue;
+        }
+        uint16_t bit = (uint16_t)(1u << (cells[i] - 1));
+        if ((s.rm[ROW(i)] | s.cm[COL(i)] | s.bm[BOX(i)]) & bit)
+            return 0; /* Two clues clash */
+        s.rm[ROW(i)] |= bit;
+        s.cm[COL(i)] |= bit;
+        s.bm[BOX(i)] |= bit;
+    }
+
+    for (;;) {
+        /* Base Case: All cells are assigned */
+        if (s.empties == 0)
+            return 1;
+
+        /* Variable Ordering: Find the cell with the fewest possible values (MRV) */
+        int min_len = 10;
+        int min_idx = -1;
+        uint16_t min_cand = 0;
+        for (int i = 0; i < 81; i++) {
+            if (cells[i] == 0) {
+                uint16_t cand = candidates(&s, i);
+                int current_len = __builtin_popcount(cand);
+                if (current_len < min_len) {
+                    min_len = current_len;
+                    min_idx = i;
+                    min_cand = cand;
+                    if (current_len <= 1)
+                        break;
+                }
+            }
+        }
+
+        /* An empty domain falls straight through to backtracking */
+        if (min_cand) {
+            frame_idx[depth] = min_idx;
+            frame_cand[depth] = min_cand;
+            frame_trail[depth] = s.trail_len;
+            depth++;
+        }
+
+        /* Take the next value of the top frame, popping exhausted frames */
+        while (depth > 0) {
+            int i = frame_idx[depth - 1];
+
+            /* Backtrack: Un-assign the value tried last in this frame and all it forced */
+            while (s.trail_len > frame_trail[depth - 1])
+                unassign(&s, s.trail[--s.trail_len]);
+            if (cells[i] != 0)
+                unassign(&s, i);
+
+            uint16_t pending = frame_cand[depth - 1];
+            if (pending) {
+                /* Assignment of the lowest remaining value */
+                uint16_t bit = pending & (uint16_t)-pending;
+                frame_cand[depth - 1] = pending ^ bit;
+                assign(&s, i, bit);
+
+                /* On a contradiction the same frame is revisited for its next value */
+                if (propagate(&s, i))
+                    break;
+                continue;
+            }
+            depth--;
+        }
+
+        if (depth == 0)
+            return 0;
+    }
+}